@@ -1,31 +1,81 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from brotli_asgi import BrotliMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne
 import os
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timedelta
-import json
+from datetime import datetime, timedelta, timezone
 import asyncio
+import re
+import string
+import numpy as np
+import orjson
+
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection with an explicitly sized pool: minPoolSize keeps warm
+# connections for burst traffic, maxIdleTimeMS stops the pool hoarding them.
+# The client is built once per worker in the startup hook rather than at
+# import time, so reloads and multi-worker runs never double-init the
+# monitor threads.
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+
+def create_mongo_client() -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=200,
+        minPoolSize=10,
+        maxIdleTimeMS=300_000,
+        serverSelectionTimeoutMS=3000,
+        connectTimeoutMS=2000,
+        waitQueueTimeoutMS=1000,
+        retryWrites=True,
+        heartbeatFrequencyMS=30_000,
+        maxConnecting=4,
+    )
+
+client: Optional[AsyncIOMotorClient] = None
+db = None
 
 # Import Gemini integration
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+import google.generativeai as genai
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of stdlib json"""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY)
 
 # Create the main app without a prefix
-app = FastAPI(title="Autonomous AI Project Manager", description="AI system that completely replaces human project managers")
+app = FastAPI(
+    title="Autonomous AI Project Manager",
+    description="AI system that completely replaces human project managers",
+    default_response_class=ORJSONResponse,
+)
+
+# Cached UTC tzinfo and clock helper; datetime.utcnow() is deprecated and
+# produced naive timestamps
+_UTC = timezone.utc
+
+def utc_now() -> datetime:
+    return datetime.now(_UTC)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -41,7 +91,7 @@ class ProjectRequirements(BaseModel):
     stakeholders: str
     timeline_preference: str
     budget_range: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
 
 class ProjectObjective(BaseModel):
     objective: str
@@ -86,7 +136,7 @@ class ProjectPlan(BaseModel):
     success_metrics: List[str]
     next_steps: List[str]
     confidence_score: float
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
 
 class ProjectRequirementsCreate(BaseModel):
     title: str
@@ -98,63 +148,19 @@ class ProjectRequirementsCreate(BaseModel):
     timeline_preference: str
     budget_range: Optional[str] = None
 
-# Initialize Gemini Chat
-def get_gemini_chat():
-    api_key = os.environ.get('GEMINI_API_KEY')
-    if not api_key:
-        raise HTTPException(status_code=500, detail="Gemini API key not configured")
-    
-    return LlmChat(
-        api_key=api_key,
-        session_id=f"planning_agent_{uuid.uuid4()}",
-        system_message="""You are an expert AI Project Manager with 20+ years of experience in project planning and management. 
-        Your role is to analyze project requirements and generate comprehensive, professional project plans that completely replace human PM capabilities.
-        
-        You excel at:
-        - Converting vague requirements into SMART objectives
-        - Creating detailed Work Breakdown Structures (WBS)
-        - Estimating realistic timelines and resources
-        - Identifying risks and mitigation strategies
-        - Defining success metrics and KPIs
-        
-        Always provide structured, actionable project plans that demonstrate superior analysis compared to human project managers."""
-    ).with_model("gemini", "gemini-2.0-flash").with_max_tokens(8000)
-
-async def generate_project_plan(requirements: ProjectRequirements) -> Dict[str, Any]:
-    """AI Planning Agent - Core function that replaces human project planning"""
-    
-    chat = get_gemini_chat()
-    
-    planning_prompt = f"""
-    AUTONOMOUS PROJECT PLANNING REQUEST
-
-    PROJECT DETAILS:
-    - Title: {requirements.title}
-    - Description: {requirements.description}
-    - Business Context: {requirements.business_context}
-    - Success Criteria: {requirements.success_criteria}
-    - Constraints: {requirements.constraints}
-    - Stakeholders: {requirements.stakeholders}
-    - Timeline Preference: {requirements.timeline_preference}
-    - Budget Range: {requirements.budget_range or 'Not specified'}
-
-    GENERATE A COMPREHENSIVE PROJECT PLAN WITH THE FOLLOWING STRUCTURE:
-
-    Please respond with a valid JSON object containing:
-
-    {{
+PLAN_SCHEMA_BLOCK = """{
         "objectives": [
-            {{
+            {
                 "objective": "Main objective statement",
                 "specific": "Specific details",
                 "measurable": "How success will be measured",
                 "achievable": "Why this is achievable",
                 "relevant": "Business relevance",
                 "time_bound": "Timeline commitment"
-            }}
+            }
         ],
         "wbs_tasks": [
-            {{
+            {
                 "id": "task_1",
                 "name": "Task Name",
                 "description": "Detailed task description",
@@ -164,54 +170,374 @@ async def generate_project_plan(requirements: ProjectRequirements) -> Dict[str,
                 "dependencies": [],
                 "assigned_role": "Role responsible",
                 "priority": "High/Medium/Low"
-            }}
+            }
         ],
         "timeline_weeks": 12,
         "resource_estimates": [
-            {{
+            {
                 "role": "Project Manager",
                 "hours_required": 200,
                 "skill_level": "Senior",
                 "cost_estimate": 25000
-            }}
+            }
         ],
         "risk_analysis": [
-            {{
+            {
                 "risk": "Risk description",
                 "probability": "High/Medium/Low",
-                "impact": "High/Medium/Low", 
+                "impact": "High/Medium/Low",
                 "mitigation_strategy": "How to mitigate",
                 "owner": "Who owns this risk"
-            }}
+            }
         ],
         "success_metrics": ["Metric 1", "Metric 2"],
         "next_steps": ["Step 1", "Step 2"],
         "confidence_score": 0.85
-    }}
+    }"""
+
+# Persistent prompt prefix: persona + output schema live in the system message,
+# sent once per batch dispatch, so each project only pays for its ephemeral
+# PROJECT DETAILS block.
+PLANNING_SYSTEM_MESSAGE = f"""You are an expert AI Project Manager with 20+ years of experience in project planning and management.
+        Your role is to analyze project requirements and generate comprehensive, professional project plans that completely replace human PM capabilities.
+
+        You excel at:
+        - Converting vague requirements into SMART objectives
+        - Creating detailed Work Breakdown Structures (WBS)
+        - Estimating realistic timelines and resources
+        - Identifying risks and mitigation strategies
+        - Defining success metrics and KPIs
+
+        Always provide structured, actionable project plans that demonstrate superior analysis compared to human project managers.
+
+        For every planning request, GENERATE A COMPREHENSIVE PROJECT PLAN FOR EACH PROJECT WITH THE FOLLOWING STRUCTURE:
+
+        Respond with a valid JSON array containing one object per project, in the same order as the request, each shaped as:
+
+        {PLAN_SCHEMA_BLOCK}
+
+        IMPORTANT: Return ONLY the JSON array, no additional text or formatting."""
+
+# Initialize Gemini Chat
+def get_gemini_chat():
+    api_key = os.environ.get('GEMINI_API_KEY')
+    if not api_key:
+        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+
+    return LlmChat(
+        api_key=api_key,
+        session_id=f"planning_agent_{uuid.uuid4()}",
+        system_message=PLANNING_SYSTEM_MESSAGE
+    ).with_model("gemini", "gemini-2.0-flash").with_max_tokens(8000)
+
+# Precompiled at import time so each request only substitutes the variable tail
+PROJECT_DETAILS_TEMPLATE = string.Template("""PROJECT DETAILS:
+    - Title: ${title}
+    - Description: ${description}
+    - Business Context: ${business_context}
+    - Success Criteria: ${success_criteria}
+    - Constraints: ${constraints}
+    - Stakeholders: ${stakeholders}
+    - Timeline Preference: ${timeline_preference}
+    - Budget Range: ${budget_range}""")
+
+def build_project_details(requirements: ProjectRequirements) -> str:
+    """Build the per-project details block of the planning prompt"""
+    return PROJECT_DETAILS_TEMPLATE.substitute(
+        title=requirements.title,
+        description=requirements.description,
+        business_context=requirements.business_context,
+        success_criteria=requirements.success_criteria,
+        constraints=requirements.constraints,
+        stakeholders=requirements.stakeholders,
+        timeline_preference=requirements.timeline_preference,
+        budget_range=requirements.budget_range or 'Not specified',
+    )
+
+def build_batch_planning_prompt(batch: List[ProjectRequirements]) -> str:
+    """Build the ephemeral part of the planning prompt for a batch of projects"""
+    details_blocks = "\n\n".join(
+        f"PROJECT {i + 1}\n    {build_project_details(req)}"
+        for i, req in enumerate(batch)
+    )
+    return f"""
+    AUTONOMOUS PROJECT PLANNING REQUEST
+
+    You are given {len(batch)} independent projects. Generate one complete plan per project,
+    as a JSON array of exactly {len(batch)} objects in the documented structure.
+
+    {details_blocks}
+    """
+
+# Matches an optional ```json / ``` fence wrapping the whole response
+JSON_FENCE_RE = re.compile(rb'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
+
+def parse_plan_response(response: str, expected_count: int) -> List[Dict[str, Any]]:
+    """Parse the JSON array of plans returned by Gemini"""
+    raw = response.encode()
+    # The anchored regex fails fast on unfenced input, and the bytes feed
+    # orjson directly without re-decoding to str
+    match = JSON_FENCE_RE.match(raw)
+    if match:
+        raw = match.group(1)
+
+    plans = orjson.loads(raw)
+    if isinstance(plans, dict):
+        plans = [plans]
+    if len(plans) != expected_count:
+        raise ValueError(f"Expected {expected_count} plans, got {len(plans)}")
+    return plans
+
+# Strong references to fire-and-forget tasks; the event loop only keeps weak
+# ones, so an unreferenced task can be garbage-collected mid-execution
+_background_tasks: set = set()
+
+def spawn_background_task(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+class PlanBatcher:
+    """Micro-batches concurrent planning requests into a single Gemini call.
+
+    Inbound requests are buffered for up to max_wait_seconds (or until
+    max_batch_size requests accumulate) and dispatched as one multiplexed
+    prompt, amortizing per-call session overhead across the batch.
+    """
+
+    def __init__(self, max_batch_size: int = 8, max_wait_seconds: float = 0.25):
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._concurrency: Optional[asyncio.Semaphore] = None
+        self._worker_task: Optional[asyncio.Task] = None
+
+    def start(self, max_concurrent_dispatches: int):
+        self._concurrency = asyncio.Semaphore(max_concurrent_dispatches)
+        self._worker_task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._worker_task:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
 
-    IMPORTANT: Return ONLY the JSON object, no additional text or formatting.
+    async def submit(self, requirements: ProjectRequirements) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((requirements, future))
+        return await future
+
+    async def _worker(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch in the background so the next batch can start collecting
+            # while this one waits for a chat and for Gemini
+            spawn_background_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        requirements_batch = [requirements for requirements, _ in batch]
+        async with self._concurrency:
+            try:
+                # Fresh chat per dispatch: LlmChat accumulates per-session
+                # history, so reusing one would grow every prompt by the
+                # previous batches' context
+                chat = get_gemini_chat()
+                prompt = build_batch_planning_prompt(requirements_batch)
+                user_message = UserMessage(text=prompt)
+                response = await chat.send_message(user_message)
+                plans = parse_plan_response(response, len(batch))
+            except (orjson.JSONDecodeError, ValueError) as e:
+                logging.error("Failed to parse JSON from Gemini response: %s", e)
+                self._fail_batch(batch, HTTPException(status_code=500, detail="Failed to generate valid project plan"))
+                return
+            except Exception as e:
+                logging.error("Error generating project plans: %s", e)
+                self._fail_batch(batch, HTTPException(status_code=500, detail="Failed to generate project plan"))
+                return
+
+        for (_, future), plan_data in zip(batch, plans):
+            if not future.done():
+                future.set_result(plan_data)
+
+    def _fail_batch(self, batch, exc: Exception):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+plan_batcher = PlanBatcher()
+
+class PlanWriteBuffer:
+    """Coalesces concurrent plan inserts into a single bulk_write round-trip.
+
+    Documents are buffered for up to flush_interval_seconds and written as
+    one unordered bulk operation, so N plans landing together cost one
+    Mongo RTT instead of N.
     """
 
+    def __init__(self, flush_interval_seconds: float = 0.05, max_batch_size: int = 50):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_batch_size = max_batch_size
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._worker_task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._worker_task:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+
+    async def insert(self, document: Dict[str, Any]):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((document, future))
+        await future
+
+    async def _worker(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.flush_interval_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        try:
+            if len(batch) == 1:
+                await db.project_plans.insert_one(batch[0][0])
+            else:
+                await db.project_plans.bulk_write(
+                    [InsertOne(document) for document, _ in batch], ordered=False
+                )
+        except Exception as e:
+            logging.error("Error persisting project plans: %s", e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(
+                        HTTPException(status_code=500, detail="Failed to save project plan")
+                    )
+            return
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+plan_write_buffer = PlanWriteBuffer()
+
+def _log_persist_failure(task: asyncio.Task):
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc:
+        logging.error("Background plan persistence failed: %s", exc)
+
+def persist_plan_in_background(document: Dict[str, Any]):
+    """Schedule a buffered plan insert without blocking the response"""
+    task = spawn_background_task(plan_write_buffer.insert(document))
+    task.add_done_callback(_log_persist_failure)
+
+# Semantic cache: near-identical requirements skip the Gemini round-trip entirely
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_TTL_SECONDS = 3600
+EMBEDDING_MODEL = "models/text-embedding-004"
+
+def requirements_cache_key(requirements: ProjectRequirements) -> str:
+    """Text over which requirement similarity is measured"""
+    return "|".join([
+        requirements.title,
+        requirements.description,
+        requirements.business_context,
+        requirements.success_criteria,
+    ])
+
+async def embed_requirements(requirements: ProjectRequirements) -> np.ndarray:
+    """Embed the requirement key text for semantic cache lookups"""
+    result = await asyncio.to_thread(
+        genai.embed_content,
+        model=EMBEDDING_MODEL,
+        content=requirements_cache_key(requirements),
+    )
+    return np.asarray(result["embedding"], dtype=np.float32)
+
+async def semantic_cache_lookup(embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+    """Return the cached entry for the nearest stored embedding, if similar enough"""
+    # Fetch only the embeddings; the winner's plan_data is read separately so
+    # a lookup never ships every cached plan over the wire
+    entries = await db.semantic_cache.find({}, {"embedding": 1}).to_list(1000)
+    if not entries:
+        return None
+    vectors = np.stack([np.frombuffer(entry["embedding"], dtype=np.float32) for entry in entries])
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(embedding)
+    similarities = vectors @ embedding / np.where(norms == 0, 1, norms)
+    best = int(np.argmax(similarities))
+    if similarities[best] <= SEMANTIC_CACHE_THRESHOLD:
+        return None
+    return await db.semantic_cache.find_one({"_id": entries[best]["_id"]}, {"plan_data": 1})
+
+async def semantic_cache_store(embedding: np.ndarray, plan_data: Dict[str, Any]):
+    await db.semantic_cache.insert_one({
+        "embedding": embedding.tobytes(),
+        "plan_data": plan_data,
+        "created_at": utc_now(),
+    })
+
+def _plan_data_is_valid(plan_data: Dict[str, Any], requirements_id: str) -> bool:
+    """Check raw LLM plan output against the ProjectPlan schema"""
+    try:
+        ProjectPlan.model_validate({**plan_data, "project_requirements_id": requirements_id})
+        return True
+    except ValidationError:
+        return False
+
+async def generate_project_plan(requirements: ProjectRequirements) -> Dict[str, Any]:
+    """AI Planning Agent - Core function that replaces human project planning"""
+    embedding = None
     try:
-        user_message = UserMessage(text=planning_prompt)
-        response = await chat.send_message(user_message)
-        
-        # Parse the JSON response
-        response_text = response.strip()
-        if response_text.startswith('```json'):
-            response_text = response_text[7:-3]
-        elif response_text.startswith('```'):
-            response_text = response_text[3:-3]
-            
-        plan_data = json.loads(response_text)
-        return plan_data
-        
-    except json.JSONDecodeError as e:
-        logging.error(f"Failed to parse JSON from Gemini response: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate valid project plan")
+        embedding = await embed_requirements(requirements)
+        entry = await semantic_cache_lookup(embedding)
+        if entry is not None:
+            if _plan_data_is_valid(entry["plan_data"], requirements.id):
+                return entry["plan_data"]
+            # A poisoned entry would otherwise replay a guaranteed 500 for an
+            # hour; drop it and fall through to generation
+            logging.error("Deleting semantic cache entry with invalid plan_data")
+            await db.semantic_cache.delete_one({"_id": entry["_id"]})
     except Exception as e:
-        logging.error(f"Error generating project plan: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate project plan")
+        # The cache must never break plan generation
+        logging.error("Semantic cache lookup failed: %s", e)
+
+    plan_data = await plan_batcher.submit(requirements)
+
+    # Only schema-valid plans are cached; invalid output still propagates so
+    # the caller reports the failure, it just isn't replayed to others
+    if embedding is not None and _plan_data_is_valid(plan_data, requirements.id):
+        try:
+            await semantic_cache_store(embedding, plan_data)
+        except Exception as e:
+            logging.error("Semantic cache store failed: %s", e)
+
+    return plan_data
 
 # API Routes
 @api_router.get("/")
@@ -221,9 +547,9 @@ async def root():
 @api_router.post("/project-requirements", response_model=ProjectRequirements)
 async def create_project_requirements(input: ProjectRequirementsCreate):
     """Submit project requirements for AI analysis"""
-    requirements_dict = input.dict()
-    requirements_obj = ProjectRequirements(**requirements_dict)
-    await db.project_requirements.insert_one(requirements_obj.dict())
+    # Input is already validated; model_construct skips revalidating the copy
+    requirements_obj = ProjectRequirements.model_construct(**input.model_dump())
+    await db.project_requirements.insert_one(requirements_obj.model_dump())
     return requirements_obj
 
 @api_router.get("/project-requirements/{requirements_id}", response_model=ProjectRequirements)
@@ -237,43 +563,155 @@ async def get_project_requirements(requirements_id: str):
         del requirements['_id']
     return ProjectRequirements(**requirements)
 
-@api_router.post("/generate-plan/{requirements_id}")
-async def generate_plan(requirements_id: str):
-    """AI Planning Agent - Generate comprehensive project plan"""
-    
+# Idempotency: requests carrying an Idempotency-Key header share one in-flight
+# task per worker, and retries within the TTL replay the stored plan instead of
+# re-invoking Gemini. Requests without the header behave like before: every
+# POST generates a fresh plan. Keys are scoped by requirements id so a reused
+# header value cannot return another request's plan.
+IDEMPOTENCY_TTL_SECONDS = 600
+_inflight_plans: Dict[str, asyncio.Task] = {}
+
+async def _persist_keyed_plan(document: Dict[str, Any], idempotency_key: str):
+    """Persist a keyed plan, then record it for replay and release the key"""
+    try:
+        await plan_write_buffer.insert(document)
+        # Written only after the plan document is durable, so a replay that
+        # finds this record always finds the plan as well
+        await db.plan_idem.update_one(
+            {"key": idempotency_key},
+            {"$set": {"plan_id": document["id"], "created_at": utc_now()}},
+            upsert=True,
+        )
+    except Exception as e:
+        logging.error("Background plan persistence failed: %s", e)
+    finally:
+        _inflight_plans.pop(idempotency_key, None)
+
+def _release_failed_inflight(task: asyncio.Task, key: str):
+    # On success the entry stays until _persist_keyed_plan removes it, so a
+    # fast retry joins the finished task instead of regenerating
+    if task.cancelled() or task.exception() is not None:
+        _inflight_plans.pop(key, None)
+
+async def _generate_plan_once(requirements_id: str, idempotency_key: Optional[str]) -> ProjectPlan:
     # Get project requirements
     requirements_doc = await db.project_requirements.find_one({"id": requirements_id})
     if not requirements_doc:
         raise HTTPException(status_code=404, detail="Project requirements not found")
-    
-    requirements = ProjectRequirements(**requirements_doc)
-    
+
+    requirements = ProjectRequirements.model_construct(
+        **{k: v for k, v in requirements_doc.items() if k != '_id'}
+    )
+
     # Generate AI-powered project plan
     try:
         plan_data = await generate_project_plan(requirements)
-        
-        # Create project plan object
-        project_plan = ProjectPlan(
-            project_requirements_id=requirements_id,
-            objectives=[ProjectObjective(**obj) for obj in plan_data["objectives"]],
-            wbs_tasks=[WBSTask(**task) for task in plan_data["wbs_tasks"]],
-            timeline_weeks=plan_data["timeline_weeks"],
-            resource_estimates=[ResourceEstimate(**res) for res in plan_data["resource_estimates"]],
-            risk_analysis=[RiskItem(**risk) for risk in plan_data["risk_analysis"]],
-            success_metrics=plan_data["success_metrics"],
-            next_steps=plan_data["next_steps"],
-            confidence_score=plan_data["confidence_score"]
+
+        # Validate the untrusted LLM output in a single pass, nested models included
+        project_plan = ProjectPlan.model_validate(
+            {**plan_data, "project_requirements_id": requirements_id}
         )
-        
-        # Save to database
-        await db.project_plans.insert_one(project_plan.dict())
-        
+
+        # Save to database off the critical path; the response doesn't depend
+        # on the write, and failures are logged in the background
+        if idempotency_key is None:
+            persist_plan_in_background(project_plan.model_dump())
+        else:
+            spawn_background_task(_persist_keyed_plan(project_plan.model_dump(), idempotency_key))
+
         return project_plan
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Error in generate_plan: {e}")
+        logging.error("Error in generate_plan: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to generate project plan: {str(e)}")
 
+async def _replay_or_generate_plan(requirements_id: str, key: str) -> Dict[str, Any]:
+    """Replay the stored plan for a key, or generate and persist a new one"""
+    idem_doc = await db.plan_idem.find_one({"key": key})
+    if idem_doc:
+        plan = await db.project_plans.find_one({"id": idem_doc["plan_id"]}, {"_id": 0})
+        if plan:
+            # Nothing pending to persist for a replay; release the key now
+            _inflight_plans.pop(key, None)
+            return plan
+    project_plan = await _generate_plan_once(requirements_id, key)
+    return project_plan.model_dump()
+
+@api_router.post("/generate-plan/{requirements_id}")
+async def generate_plan(requirements_id: str, idempotency_key: Optional[str] = Header(default=None)):
+    """AI Planning Agent - Generate comprehensive project plan
+
+    Duplicate suppression for an Idempotency-Key is per worker process until
+    the plan document is durable; a retry routed to a different uvicorn
+    worker during generation can still trigger a second Gemini call.
+    """
+    if idempotency_key is None:
+        # No key: a repeat POST is an intentional regeneration
+        return await _generate_plan_once(requirements_id, None)
+
+    key = f"{requirements_id}:{idempotency_key}"
+
+    # Register the key with no await between lookup and insert, so duplicates
+    # arriving together always join the same task
+    task = _inflight_plans.get(key)
+    if task is None:
+        task = asyncio.create_task(_replay_or_generate_plan(requirements_id, key))
+        _inflight_plans[key] = task
+        task.add_done_callback(lambda t, key=key: _release_failed_inflight(t, key))
+    return await task
+
+@api_router.post("/generate-plan/{requirements_id}/stream")
+async def generate_plan_stream(requirements_id: str):
+    """AI Planning Agent - Generate a project plan as an NDJSON stream
+
+    First bytes (status heartbeats) go out while Gemini is still
+    generating, then the finished plan is emitted one top-level section
+    per line, followed by a final status line.
+    """
+    requirements_doc = await db.project_requirements.find_one({"id": requirements_id})
+    if not requirements_doc:
+        raise HTTPException(status_code=404, detail="Project requirements not found")
+
+    requirements = ProjectRequirements.model_construct(
+        **{k: v for k, v in requirements_doc.items() if k != '_id'}
+    )
+
+    async def plan_stream():
+        yield orjson.dumps({"status": "generating"}) + b"\n"
+        # Strong reference: a client disconnect cancels this generator, and a
+        # bare task could be garbage-collected mid-generation
+        task = spawn_background_task(generate_project_plan(requirements))
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=5)
+            if done:
+                break
+            # Heartbeat keeps the connection warm during long generations
+            yield orjson.dumps({"status": "generating"}) + b"\n"
+
+        try:
+            plan_data = task.result()
+            project_plan = ProjectPlan.model_validate(
+                {**plan_data, "project_requirements_id": requirements_id}
+            )
+        except HTTPException as e:
+            yield orjson.dumps({"status": "error", "detail": e.detail}) + b"\n"
+            return
+        except Exception as e:
+            logging.error("Error in generate_plan_stream: %s", e)
+            yield orjson.dumps({"status": "error", "detail": "Failed to generate project plan"}) + b"\n"
+            return
+
+        plan_doc = project_plan.model_dump()
+        persist_plan_in_background(plan_doc)
+
+        for section, value in plan_doc.items():
+            yield orjson.dumps({section: value}, option=orjson.OPT_NAIVE_UTC) + b"\n"
+        yield orjson.dumps({"status": "complete"}) + b"\n"
+
+    return StreamingResponse(plan_stream(), media_type="application/x-ndjson")
+
 @api_router.get("/project-plan/{plan_id}")
 async def get_project_plan(plan_id: str):
     """Get generated project plan by ID"""
@@ -286,43 +724,107 @@ async def get_project_plan(plan_id: str):
     return plan
 
 @api_router.get("/project-plans")
-async def get_all_project_plans():
-    """Get all generated project plans"""
-    plans = await db.project_plans.find().to_list(100)
-    # Convert ObjectId to string for JSON serialization
-    for plan in plans:
-        if '_id' in plan:
-            del plan['_id']
-    return plans
+async def get_all_project_plans(limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None):
+    """Get generated project plans as a paginated summary list"""
+    query = {"id": {"$gt": cursor}} if cursor else {}
+    projection = {
+        "_id": 0,
+        "id": 1,
+        "project_requirements_id": 1,
+        "timeline_weeks": 1,
+        "confidence_score": 1,
+        "created_at": 1,
+    }
+    plans = await db.project_plans.find(query, projection).sort("id", 1).to_list(limit)
+    next_cursor = plans[-1]["id"] if len(plans) == limit else None
+    return {"items": plans, "next_cursor": next_cursor}
 
 @api_router.get("/project-requirements")
-async def get_all_project_requirements():
-    """Get all project requirements"""
-    requirements = await db.project_requirements.find().to_list(100)
-    # Convert ObjectId to string for JSON serialization
-    for req in requirements:
-        if '_id' in req:
-            del req['_id']
-    return requirements
+async def get_all_project_requirements(limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None):
+    """Get project requirements as a paginated summary list"""
+    query = {"id": {"$gt": cursor}} if cursor else {}
+    projection = {
+        "_id": 0,
+        "id": 1,
+        "title": 1,
+        "timeline_preference": 1,
+        "created_at": 1,
+    }
+    requirements = await db.project_requirements.find(query, projection).sort("id", 1).to_list(limit)
+    next_cursor = requirements[-1]["id"] if len(requirements) == limit else None
+    return {"items": requirements, "next_cursor": next_cursor}
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Compress large JSON responses (plan lists with long WBS trees shrink ~10x);
+# Brotli when the client supports it, with brotli-asgi's gzip fallback otherwise.
+# The NDJSON streaming route is excluded: compressing it buffers the heartbeat
+# and per-section chunks until the stream closes, defeating incremental delivery
+app.add_middleware(
+    BrotliMiddleware,
+    quality=4,
+    minimum_size=1024,
+    gzip_fallback=True,
+    excluded_handlers=[r"/api/generate-plan/.*/stream"],
+)
+
+# Pin origins/methods/headers so preflight responses are cacheable for a day
+# instead of being recomputed per request
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[os.environ.get('FRONTEND_ORIGIN', '*')],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Idempotency-Key"],
+    max_age=86400,
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Configure logging: handlers attach to a queue so log calls never block the
+# event loop; a listener thread does the actual stderr writes
+log_queue: queue.Queue = queue.Queue(-1)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 )
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+log_listener = QueueListener(log_queue, _stream_handler, respect_handler_level=True)
 logger = logging.getLogger(__name__)
 
+GEMINI_MAX_CONCURRENT_BATCHES = 8
+
+@app.on_event("startup")
+async def startup_plan_batcher():
+    log_listener.start()
+
+    # One Motor client per worker process, created exactly once
+    global client, db
+    client = create_mongo_client()
+    db = client[os.environ['DB_NAME']]
+
+    plan_batcher.start(GEMINI_MAX_CONCURRENT_BATCHES)
+    plan_write_buffer.start()
+
+    genai.configure(api_key=os.environ.get('GEMINI_API_KEY'))
+    # Expire semantic cache entries one hour after creation
+    await db.semantic_cache.create_index("created_at", expireAfterSeconds=SEMANTIC_CACHE_TTL_SECONDS)
+
+    # Indexes for the id lookups used by the query endpoints
+    await db.project_requirements.create_index("id", unique=True)
+    await db.project_plans.create_index("id", unique=True)
+    await db.project_plans.create_index("project_requirements_id")
+
+    # Idempotency records expire after ten minutes
+    await db.plan_idem.create_index("key", unique=True)
+    await db.plan_idem.create_index("created_at", expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS)
+
+    # Warm the connection pool so the first requests don't pay handshake cost
+    await db.command("ping")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await plan_batcher.stop()
+    await plan_write_buffer.stop()
+    if client is not None:
+        client.close()
+    log_listener.stop()
@@ -5,8 +5,11 @@ set -e
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
 echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+# Start Uvicorn with proper host binding, uvloop/httptools and concurrency limits
+uvicorn server:app --host 0.0.0.0 --port 8001 \
+    --loop uvloop --http httptools \
+    --workers "${UVICORN_WORKERS:-2}" \
+    --limit-concurrency 1000 --timeout-keep-alive 30 &
 BACKEND_PID=$!
 
 echo "Waiting for backend to start..."